@@ -1,12 +1,13 @@
-import math
-
 class Aerodynamics:
     def __init__(self, parameters):
         self.cd = float(parameters["cd"])
         self.front_area = float(parameters["front_area"])
         self.air_density = 1.225
         
+        # Constant part of the drag equation, F = 0.5*rho*v^2*cd*A
+        self.half_rho_cd_area = 0.5*self.air_density*self.cd*self.front_area
+        
         self.drag_force = 0 
         
     def update(self, velocity):
-        self.drag_force = 0.5*self.air_density*math.pow(velocity,2)*self.cd*self.front_area
\ No newline at end of file
+        self.drag_force = self.half_rho_cd_area*velocity*velocity
\ No newline at end of file
@@ -6,6 +6,10 @@ class TyreClass:
         self.radius = 0.2032 #meters
         self.friction_coefficient = 1.5
         
+        # Derived constants, saves a divide or multiply per update
+        self.inv_radius = 1.0 / self.radius
+        self.mu_times_radius = self.friction_coefficient * self.radius
+        
         # Set by vehicle dynamics
         self.fz = 0 
         
@@ -19,19 +23,6 @@ class TyreClass:
         # Set according to motor torque through gearbox
         self.torque = 0
         self.tractive_force = 0
-        
-    def update(self, vehicle_velocity = 0, fz = 0, drive_torque = 0, brake_torque = 0):        
-        # Set input values
-        self.radial_velocity = vehicle_velocity / self.radius
-        self.fz = fz
-        self.torque = drive_torque + brake_torque
-        
-        # Calculate grip limit
-        self.producable_grip_force = self.fz * self.friction_coefficient
-        self.produceable_grip_torque = self.producable_grip_force * self.radius
-        
-        # Set tractive force used by simulation kinematics to accelerate the car
-        self.tractive_force = self.torque / self.radius
 
 class MotorClass:
     def __init__(self, power_limit):
@@ -51,57 +42,11 @@ class MotorClass:
         self.producable_torque = 0
         self.torque = 0
         self.power = 0 #Watts
-
-    def update(self, radial_velocity = 1000, torque_request = 0):
-        # Set input values
-        self.radial_velocity = radial_velocity
-        self.torque_request = torque_request
-        
-        # Determine power limited torque at current wheel speed (And avoid division by zero)
-        if self.radial_velocity != 0:
-            power_limited_torque = self.power_limit/self.radial_velocity
-        else:
-            power_limited_torque = self.torque_limit
-
-        # Determine if producable torque is power limit limited or torque limit limited
-        if power_limited_torque < self.torque_limit:
-            self.producable_torque = power_limited_torque
-        else:
-            self.producable_torque = self.torque_limit
-
-        # Derate torque approaching max RPM
-        rpm_limit_derate_factor = 1
-        radial_velocty_remaining = self.max_radial_velocity - self.radial_velocity
-
-        if radial_velocty_remaining < 600:
-            rpm_limit_derate_factor = radial_velocty_remaining / 600
-            
-        self.producable_torque = self.producable_torque * rpm_limit_derate_factor
-        
-        # Set current torque as requested torque limited to producable torque
-        if self.torque_request > self.producable_torque:
-            self.torque = self.producable_torque
-        else:
-            self.torque = self.torque_request
-            
-        # Calculate motor operating power
-        self.power = self.torque * self.radial_velocity
             
 class GearboxClass:
     def __init__(self, gear_ratio):
         self.gear_ratio = gear_ratio
-        
-    def velocity_wheel_to_motor(self, wheel_velocity):
-        return wheel_velocity*self.gear_ratio
-    
-    def velocity_motor_to_wheel(self, motor_velocity):
-        return motor_velocity/self.gear_ratio
-    
-    def torque_wheel_to_motor(self, wheel_torque):
-        return wheel_torque/self.gear_ratio
-    
-    def torque_motor_to_wheel(self, motor_torque):
-        return motor_torque*self.gear_ratio
+        self.inv_gear_ratio = 1.0 / gear_ratio
 
 class Drivetrain:
     def __init__(self, drivetrain_parameters):
@@ -113,17 +58,21 @@ class Drivetrain:
         self.regen_power = 0
 
     def update(self, vehicle_velocity, fz=0, drive=1, pack_voltage=489.6):
+        # Motor, gearbox and tyre are stepped together here on local values (gearbox
+        # conversions inlined), their state attributes are written back once at the end
+        tyre = self.tyre
+        motor = self.motor
+        gear_ratio = self.gearbox.gear_ratio
+        
         # Calculate voltage-limited power
-        max_power_from_voltage = pack_voltage * self.max_current if pack_voltage > 0 else self.motor.power_limit
+        max_power_from_voltage = pack_voltage * self.max_current if pack_voltage > 0 else motor.power_limit
         
         # Reduce power limit if voltage is low
-        voltage_derated_power = min(self.motor.power_limit, max_power_from_voltage)
-        original_power_limit = self.motor.power_limit
-        self.motor.power_limit = voltage_derated_power
+        power_limit = min(motor.power_limit, max_power_from_voltage)
         
         if drive > 0:
             # On Throttle
-            motor_torque_request = drive * self.gearbox.torque_wheel_to_motor(self.tyre.produceable_grip_torque)
+            motor_torque_request = drive * (tyre.produceable_grip_torque * self.gearbox.inv_gear_ratio)
             tyre_braking_torque = 0
         else:
             if drive == 0:
@@ -133,20 +82,61 @@ class Drivetrain:
             else:
                 # Braking
                 motor_torque_request = 0
-                tyre_braking_torque = drive * self.tyre.produceable_grip_torque
+                tyre_braking_torque = drive * tyre.produceable_grip_torque
+        
+        # Motor radial velocity set from tyre radial velocity through gearbox
+        motor_velocity = tyre.radial_velocity * gear_ratio
+        
+        # Determine power limited torque at current wheel speed (And avoid division by zero)
+        torque_limit = motor.torque_limit
+        power_limited_torque = power_limit/motor_velocity if motor_velocity != 0 else torque_limit
+
+        # Producable torque is the lower of the power limited and torque limited torque
+        producable_torque = power_limited_torque if power_limited_torque < torque_limit else torque_limit
+
+        # Derate torque approaching max RPM, clamped at zero so torque can't reverse above max RPM
+        radial_velocty_remaining = motor.max_radial_velocity - motor_velocity
+
+        if radial_velocty_remaining < 600:
+            rpm_limit_derate_factor = radial_velocty_remaining / 600 if radial_velocty_remaining > 0 else 0
+            producable_torque = producable_torque * rpm_limit_derate_factor
         
-        # Update motor object, setting radial velocity
-        motor_velocity = self.gearbox.velocity_wheel_to_motor(self.tyre.radial_velocity)
-        self.motor.update(motor_velocity, motor_torque_request)
+        # Set current torque as requested torque limited to producable torque
+        motor_torque = motor_torque_request if motor_torque_request < producable_torque else producable_torque
         
-        # Update tyre object, setting torque
-        tyre_driving_torque = self.gearbox.torque_motor_to_wheel(self.motor.torque)
-        self.tyre.update(vehicle_velocity, fz, tyre_driving_torque, tyre_braking_torque) 
+        # Tyre torque from motor torque through gearbox, radial velocity from vehicle speed (assume tyres never slip)
+        tyre_driving_torque = motor_torque * gear_ratio
+        tyre_torque = tyre_driving_torque + tyre_braking_torque
+        tyre_radial_velocity = vehicle_velocity * tyre.inv_radius
         
-        # Calculate Braking Power
-        self.regen_power = -tyre_braking_torque * self.tyre.radial_velocity
-        if self.regen_power > self.regen_limit:
-            self.regen_power = self.regen_limit
+        # Calculate grip limit
+        producable_grip_force = fz * tyre.friction_coefficient
         
-        # Restore original power limit for next iteration
-        self.motor.power_limit = original_power_limit
\ No newline at end of file
+        # Calculate Braking Power
+        regen_power = -tyre_braking_torque * tyre_radial_velocity
+        if regen_power > self.regen_limit:
+            regen_power = self.regen_limit
+        
+        # Calculate motor operating power and tyre tractive force
+        motor_power = motor_torque * motor_velocity
+        tractive_force = tyre_torque * tyre.inv_radius
+        
+        # Store motor state
+        motor.radial_velocity = motor_velocity
+        motor.torque_request = motor_torque_request
+        motor.producable_torque = producable_torque
+        motor.torque = motor_torque
+        motor.power = motor_power
+        
+        # Store tyre state, tractive force is used by simulation kinematics to accelerate the car
+        tyre.radial_velocity = tyre_radial_velocity
+        tyre.fz = fz
+        tyre.torque = tyre_torque
+        tyre.producable_grip_force = producable_grip_force
+        tyre.produceable_grip_torque = fz * tyre.mu_times_radius
+        tyre.tractive_force = tractive_force
+        
+        self.regen_power = regen_power
+        
+        # Return the outputs the vehicle sums across its four corners
+        return tractive_force, producable_grip_force, motor_power, regen_power
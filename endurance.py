@@ -1,5 +1,6 @@
 import math
 import json
+import numpy as np
 import matplotlib.pyplot as plt
 from drivetrain import *
 from track import *
@@ -8,7 +9,18 @@ from aerodynamics import *
 from defined_tracks import *
 
 timestep = 0.0001
-sim_time = 0
+
+# Per-lap log layout, one contiguous row per logged channel
+# (only channels read after the lap are logged, total power draw is not logged twice)
+(X_ROW, VELOCITY_ROW, SOC_ROW, CURRENT_ROW, ENERGY_REMAINING_ROW,
+ PACK_VOLTAGE_ROW, REGEN_POWER_ROW, TOTAL_POWER_ROW) = range(8)
+NUM_LOG_ROWS = 8
+
+# Used to size the log buffer up front, it is doubled if a lap runs longer
+expected_lap_time = 150  # seconds
+
+# Stored lap channels are downsampled to roughly this many points for plotting
+plot_points_per_lap = 4000
 
 class Accumulator:
     """Battery pack with capacity tracking, thermal modeling, and voltage dynamics"""
@@ -29,6 +41,7 @@ class Accumulator:
         self.num_parallel = int(accu_params["num_parallel"])
         self.total_cells = self.num_series * self.num_parallel
         self.internal_resistance = float(accu_params["internal_resistance"])
+        self.inv_internal_resistance = 1.0 / self.internal_resistance if self.internal_resistance > 0 else 0
         
         # Thermal parameters
         self.cell_temp = initial_temp
@@ -42,6 +55,9 @@ class Accumulator:
         self.usable_capacity_j = self.total_capacity_j
         # Set initial energy_used based on starting SoC
         self.energy_used_j = self.usable_capacity_j * (1.0 - initial_soc_percent / 100.0)
+        # Cached from energy_used_j, refreshed on every update
+        self.soc_percent = ((self.usable_capacity_j - self.energy_used_j) / self.usable_capacity_j) * 100
+        self.energy_remaining_kwh = (self.usable_capacity_j - self.energy_used_j) / 3600000
         
         # Real-time states
         self.current_discharge_a = 0
@@ -52,16 +68,22 @@ class Accumulator:
         
     def update(self, power_draw_w, timestep):
         """Update accumulator state with thermal and electrical dynamics"""
+        # Work on local copies of the pack constants, state is written back once at the end
+        min_voltage = self.min_voltage
+        max_voltage = self.max_voltage
+        max_current = self.max_current
+        internal_resistance = self.internal_resistance
+        
         # Calculate initial pack voltage based on SoC
-        soc = self.get_soc_percent() / 100.0
-        open_circuit_voltage = self.min_voltage + (self.max_voltage - self.min_voltage) * soc
+        soc = self.soc_percent / 100.0
+        open_circuit_voltage = min_voltage + (max_voltage - min_voltage) * soc
         
         # Calculate desired current (I = P/V)
         desired_current = power_draw_w / open_circuit_voltage if open_circuit_voltage > 0 else 0
         
         # HARD LIMIT: Enforce max current during discharge
-        if desired_current > self.max_current:
-            actual_current = self.max_current
+        if desired_current > max_current:
+            actual_current = max_current
             actual_power = actual_current * open_circuit_voltage
         else:
             actual_current = desired_current
@@ -69,10 +91,10 @@ class Accumulator:
         
         # For regenerative braking (negative power), check voltage doesn't exceed max
         if power_draw_w < 0:  # Regen/charging
-            regen_voltage = open_circuit_voltage - (desired_current * self.internal_resistance)
-            if regen_voltage > self.max_voltage:
+            regen_voltage = open_circuit_voltage - (desired_current * internal_resistance)
+            if regen_voltage > max_voltage:
                 # Limit regen current to prevent overvoltage
-                max_regen_current = (self.max_voltage - open_circuit_voltage) / self.internal_resistance
+                max_regen_current = (max_voltage - open_circuit_voltage) * self.inv_internal_resistance
                 actual_current = max(max_regen_current, desired_current)  # max_regen_current is negative
                 actual_power = actual_current * open_circuit_voltage
         
@@ -83,39 +105,50 @@ class Accumulator:
             energy_delta_j = actual_power * timestep  # Regen doesn't get multiplier
         self.energy_used_j += energy_delta_j
         
-        # Store actual current
-        self.current_discharge_a = actual_current
+        # Refresh cached SoC and energy remaining
+        energy_remaining_j = self.usable_capacity_j - self.energy_used_j
+        self.soc_percent = (energy_remaining_j / self.usable_capacity_j) * 100
+        self.energy_remaining_kwh = energy_remaining_j / 3600000
         
         # C-rate calculation (current relative to capacity)
-        self.c_rate = self.current_discharge_a / self.total_capacity_ah if self.total_capacity_ah > 0 else 0
+        total_capacity_ah = self.total_capacity_ah
+        c_rate = actual_current / total_capacity_ah if total_capacity_ah > 0 else 0
         
         # Voltage sag due to internal resistance (V_sag = I * R)
-        self.voltage_sag = abs(self.current_discharge_a) * self.internal_resistance
+        voltage_sag = abs(actual_current) * internal_resistance
         
         # Pack voltage accounting for SoC and voltage sag
         if actual_current >= 0:  # Discharge
-            self.pack_voltage = open_circuit_voltage - self.voltage_sag
+            pack_voltage = open_circuit_voltage - voltage_sag
         else:  # Regen/charge
-            self.pack_voltage = open_circuit_voltage + self.voltage_sag
+            pack_voltage = open_circuit_voltage + voltage_sag
         
         # Enforce hard voltage limits
-        self.pack_voltage = max(min(self.pack_voltage, self.max_voltage), self.min_voltage)
+        pack_voltage = max(min(pack_voltage, max_voltage), min_voltage)
         
         # Power loss due to internal resistance (P_loss = I²R)
-        self.power_loss_w = (self.current_discharge_a ** 2) * self.internal_resistance
+        power_loss_w = (actual_current * actual_current) * internal_resistance
         
         # Thermal model: dT/dt = (P_loss - cooling) / thermal_mass
-        cooling_power = self.cooling_coefficient * (self.cell_temp - self.ambient_temp)
-        temp_rate = (self.power_loss_w - cooling_power) / self.thermal_mass
-        self.cell_temp += temp_rate * timestep
+        cell_temp = self.cell_temp
+        cooling_power = self.cooling_coefficient * (cell_temp - self.ambient_temp)
+        temp_rate = (power_loss_w - cooling_power) / self.thermal_mass
+        
+        # Store updated state
+        self.current_discharge_a = actual_current
+        self.c_rate = c_rate
+        self.voltage_sag = voltage_sag
+        self.pack_voltage = pack_voltage
+        self.power_loss_w = power_loss_w
+        self.cell_temp = cell_temp + temp_rate * timestep
         
     def get_soc_percent(self):
         """State of Charge as percentage"""
-        return ((self.usable_capacity_j - self.energy_used_j) / self.usable_capacity_j) * 100
+        return self.soc_percent
     
     def get_energy_remaining_kwh(self):
         """Energy remaining in kWh"""
-        return (self.usable_capacity_j - self.energy_used_j) / 3600000
+        return self.energy_remaining_kwh
             
 class Kinematics:
     def __init__(self, mass):
@@ -128,7 +161,7 @@ class Kinematics:
         self.velocity += self.acceleration * timestep
         
     def braking_distance(self, target_speed, braking_force):
-        distance = (pow(target_speed,2)-pow(self.velocity,2))/(2*(-braking_force/self.mass))
+        distance = (target_speed*target_speed-self.velocity*self.velocity)/(2*(-braking_force/self.mass))
         return distance
        
 class Vehicle:
@@ -143,8 +176,11 @@ class Vehicle:
         self.FR_drivetrain = Drivetrain(vehicle_parameters["FR_drivetrain"])
         self.RL_drivetrain = Drivetrain(vehicle_parameters["RL_drivetrain"])
         self.RR_drivetrain = Drivetrain(vehicle_parameters["RR_drivetrain"])
+        self.drivetrains = (self.FL_drivetrain, self.FR_drivetrain, self.RL_drivetrain, self.RR_drivetrain)
         
         self.vehicle_tractive_force = 0
+        self.total_motor_power = 0
+        self.total_regen_power = 0
         self.longitudinal_force = 0
         self.producable_grip_force = 1
         self.drag_force = 0
@@ -156,22 +192,81 @@ class Vehicle:
     def update(self, drive, pack_voltage):
         self.dynamic_loading.update(self.longitudinal_force)
         self.aerodynamics.update(self.kinematics.velocity)
-        self.FL_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.FL_z, drive, pack_voltage)
-        self.FR_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.FR_z, drive, pack_voltage)
-        self.RL_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.RL_z, drive, pack_voltage)
-        self.RR_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.RR_z, drive, pack_voltage)
-
-        self.vehicle_tractive_force = self.FL_drivetrain.tyre.tractive_force + self.FR_drivetrain.tyre.tractive_force + self.RL_drivetrain.tyre.tractive_force + self.RR_drivetrain.tyre.tractive_force
+        
+        velocity = self.kinematics.velocity
+        wheel_loads = (self.dynamic_loading.FL_z, self.dynamic_loading.FR_z,
+                       self.dynamic_loading.RL_z, self.dynamic_loading.RR_z)
+        
+        # Update each corner and total its outputs in the same pass
+        tractive_force = 0
+        producable_grip_force = 0
+        motor_power = 0
+        regen_power = 0
+        for drivetrain, fz in zip(self.drivetrains, wheel_loads):
+            corner_tractive, corner_grip, corner_motor_power, corner_regen = drivetrain.update(velocity, fz, drive, pack_voltage)
+            tractive_force += corner_tractive
+            producable_grip_force += corner_grip
+            motor_power += corner_motor_power
+            regen_power += corner_regen
+        
+        self.vehicle_tractive_force = tractive_force
         self.longitudinal_force = self.vehicle_tractive_force - self.aerodynamics.drag_force
 
-        self.producable_grip_force = self.FL_drivetrain.tyre.producable_grip_force + self.FR_drivetrain.tyre.producable_grip_force + self.RL_drivetrain.tyre.producable_grip_force + self.RR_drivetrain.tyre.producable_grip_force
+        self.producable_grip_force = producable_grip_force
+        self.total_motor_power = motor_power
+        self.total_regen_power = regen_power
 
         self.kinematics.update(self.longitudinal_force)
     
     def get_total_power(self):
         """Get total instantaneous power draw from all motors"""
-        return (self.RL_drivetrain.motor.power + self.RR_drivetrain.motor.power + 
-                self.FL_drivetrain.motor.power + self.FR_drivetrain.motor.power)
+        return self.total_motor_power
+
+def run_lap(vehicle, accumulator, track, log, start_time, timestep):
+    """Drive one lap of the track, logging each timestep as a column of log.
+    
+    Returns the lap time, the number of logged steps and the log array, which
+    is replaced by a larger copy if the lap outlasts it."""
+    # Per-step lookups as locals
+    accumulator_update = accumulator.update
+    vehicle_update = vehicle.update
+    track_drive = track.drive
+    is_driving = track.is_driving
+    kinematics = vehicle.kinematics
+    max_steps = log.shape[1]
+    sim_time = 0
+    i = 0
+    
+    while is_driving():
+        # Update accumulator FIRST to get current pack voltage
+        total_power_estimate = vehicle.total_motor_power  # Last frame's power
+        regen_power_estimate = vehicle.total_regen_power
+        net_power_estimate = total_power_estimate - regen_power_estimate
+        accumulator_update(net_power_estimate, timestep)
+        
+        # NOW update vehicle with current pack voltage
+        vehicle_update(track_drive(vehicle, timestep), accumulator.pack_voltage)
+        sim_time += timestep
+        
+        # Power for logging and the next iteration
+        total_power = vehicle.total_motor_power
+        regen_power = vehicle.total_regen_power
+        
+        # Data logging (grow the buffer if the lap outlasts the estimate)
+        if i == max_steps:
+            log = np.concatenate((log, np.empty_like(log)), axis=1)
+            max_steps *= 2
+        log[:, i] = (start_time + sim_time,
+                     kinematics.velocity,
+                     accumulator.soc_percent,
+                     accumulator.current_discharge_a,
+                     accumulator.energy_remaining_kwh,
+                     accumulator.pack_voltage,
+                     regen_power / 1000,
+                     total_power / 1000)
+        i += 1
+    
+    return sim_time, i, log
 
 # Load Vehicle Configuration
 vehicle_json_file = "vehicles/"+ input('Vehicle JSON file: ')
@@ -211,6 +306,9 @@ track = Track(defined_tracks.calder_autox, vehicle)
 # Ask for number of laps
 num_laps = int(input('Number of laps to simulate: '))
 
+# Logging buffer shared by every lap, lap channels are copied out at the end of each lap
+log = np.empty((NUM_LOG_ROWS, int(expected_lap_time / timestep) + 1000))
+
 # Multi-lap tracking
 all_lap_data = []
 cumulative_time = 0
@@ -222,23 +320,6 @@ print(f"Configuration: {accumulator.num_series}S{accumulator.num_parallel}P ({ac
 print(f"Internal Resistance: {accumulator.internal_resistance}Ω\n")
 
 for lap_num in range(1, num_laps + 1):
-    # Reset per-lap variables (NOT the accumulator)
-    sim_time = 0
-    x = []
-    velocity = []
-    available_power = []
-    actual_power = []
-    soc_percent = []
-    discharge_current = []
-    energy_remaining_kwh = []
-    pack_voltage = []
-    voltage_sag = []
-    regen_power_track = []
-    total_power_draw = []
-    power_loss = []
-    energy_consumed = 0
-    energy_regenerated = 0
-    
     print(f"--- Lap {lap_num} ---")
     print(f"Starting SoC: {accumulator.get_soc_percent():.1f}%")
     print(f"Starting Temp: {accumulator.cell_temp:.1f}°C")
@@ -249,53 +330,15 @@ for lap_num in range(1, num_laps + 1):
     vehicle.kinematics.acceleration = 0
     
     # Sim loop for this lap
-    while track.is_driving():
-        # Update accumulator FIRST to get current pack voltage
-        total_power_estimate = vehicle.get_total_power()  # Get last frame's power
-        regen_power_estimate = (vehicle.RL_drivetrain.regen_power + vehicle.RR_drivetrain.regen_power + 
-                               vehicle.FL_drivetrain.regen_power + vehicle.FR_drivetrain.regen_power)
-        net_power_estimate = total_power_estimate - regen_power_estimate
-        accumulator.update(net_power_estimate, timestep)
-        
-        # NOW update vehicle with current pack voltage
-        vehicle.update(track.drive(vehicle, timestep), accumulator.pack_voltage)
-        sim_time += timestep
-        
-        # Power and energy calculations (for next iteration)
-        total_power = vehicle.get_total_power()
-        energy_consumed += total_power * timestep
-        
-        regen_power = (vehicle.RL_drivetrain.regen_power + vehicle.RR_drivetrain.regen_power + 
-                       vehicle.FL_drivetrain.regen_power + vehicle.FR_drivetrain.regen_power)
-        energy_regenerated += regen_power * timestep
-        
-        # Data logging
-        x.append(cumulative_time + sim_time)
-        velocity.append(vehicle.kinematics.velocity)
-        
-        # Power data
-        max_available_power = (float(vehicle_parameters["FL_drivetrain"]["power_limit"]) + 
-                              float(vehicle_parameters["FR_drivetrain"]["power_limit"]) + 
-                              float(vehicle_parameters["RL_drivetrain"]["power_limit"]) + 
-                              float(vehicle_parameters["RR_drivetrain"]["power_limit"]))
-        available_power.append(max_available_power / 1000)
-        actual_power.append(total_power / 1000)
-        
-        # Accumulator data
-        soc_percent.append(accumulator.get_soc_percent())
-        discharge_current.append(accumulator.current_discharge_a)
-        energy_remaining_kwh.append(accumulator.get_energy_remaining_kwh())
-        pack_voltage.append(accumulator.pack_voltage)
-        voltage_sag.append(accumulator.voltage_sag)
-        regen_power_track.append(regen_power / 1000)
-        total_power_draw.append(total_power / 1000)
-        power_loss.append(accumulator.power_loss_w / 1000)
+    sim_time, i, log = run_lap(vehicle, accumulator, track, log, cumulative_time, timestep)
     
-    # Lap results
+    # Lap results, energy integrated from the logged power draw and regen power (kW -> J)
+    energy_consumed = log[TOTAL_POWER_ROW, :i].sum() * 1000 * timestep
+    energy_regenerated = log[REGEN_POWER_ROW, :i].sum() * 1000 * timestep
     lap_energy_used = (energy_consumed - energy_regenerated) / 3600000
     lap_soc_final = accumulator.get_soc_percent()
     lap_temp_final = accumulator.cell_temp
-    lap_min_voltage = min(pack_voltage)
+    lap_min_voltage = log[PACK_VOLTAGE_ROW, :i].min()
     
     print(f"Lap Time: {sim_time:.2f}s")
     print(f"Energy Used: {lap_energy_used:.2f}kWh")
@@ -303,15 +346,17 @@ for lap_num in range(1, num_laps + 1):
     print(f"Final Temp: {lap_temp_final:.1f}°C")
     print(f"Min Pack Voltage: {lap_min_voltage:.1f}V\n")
     
-    # Store lap data
+    # Store lap data, plotted channels are kept as downsampled float32 arrays so the
+    # lap's full logging buffer can be released (summary values above use full resolution)
+    stride = max(1, i // plot_points_per_lap)
     all_lap_data.append({
         'lap': lap_num,
-        'x': x,
-        'velocity': velocity,
-        'soc': soc_percent,
-        'pack_voltage': pack_voltage,
-        'current': discharge_current,
-        'energy_remaining': energy_remaining_kwh,
+        'x': log[X_ROW, :i:stride].astype(np.float32),
+        'velocity': log[VELOCITY_ROW, :i:stride].astype(np.float32),
+        'soc': log[SOC_ROW, :i:stride].astype(np.float32),
+        'pack_voltage': log[PACK_VOLTAGE_ROW, :i:stride].astype(np.float32),
+        'current': log[CURRENT_ROW, :i:stride].astype(np.float32),
+        'energy_remaining': log[ENERGY_REMAINING_ROW, :i:stride].astype(np.float32),
         'energy_used_kwh': lap_energy_used,
         'final_soc': lap_soc_final,
         'final_temp': lap_temp_final,
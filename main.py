@@ -1,5 +1,8 @@
 import math
 import json
+import argparse
+from dataclasses import dataclass
+import numpy as np
 import matplotlib.pyplot as plt
 from drivetrain import *
 from track import *
@@ -8,7 +11,15 @@ from aerodynamics import *
 from defined_tracks import *
 
 timestep = 0.0001
-sim_time = 0
+
+# Lap log layout, one contiguous row per logged channel
+# (total power draw is the same channel as actual power, so it is not logged twice)
+(X_ROW, VELOCITY_ROW, ACTUAL_POWER_ROW, SOC_ROW, CURRENT_ROW,
+ ENERGY_REMAINING_ROW, PACK_VOLTAGE_ROW, VOLTAGE_SAG_ROW, REGEN_POWER_ROW,
+ POWER_LOSS_ROW) = range(10)
+NUM_LOG_ROWS = 10
+
+expected_lap_time = 150  # seconds, sets the initial size of the lap log
 
 class Accumulator:
     """Battery pack with capacity tracking, thermal modeling, and voltage dynamics"""
@@ -42,6 +53,11 @@ class Accumulator:
         self.usable_capacity_j = self.total_capacity_j
         self.energy_used_j = 0
         
+        # Derived constants used every update
+        self.voltage_span = self.max_voltage - self.min_voltage
+        self.inv_usable_capacity_j = 1.0 / self.usable_capacity_j
+        self.inv_total_capacity_ah = 1.0 / self.total_capacity_ah if self.total_capacity_ah > 0 else 0
+        
         # Real-time states
         self.current_discharge_a = 0
         self.pack_voltage = self.nominal_voltage
@@ -52,8 +68,8 @@ class Accumulator:
     def update(self, power_draw_w, timestep):
         """Update accumulator state with thermal and electrical dynamics"""
         # Calculate initial pack voltage based on SoC
-        soc = self.get_soc_percent() / 100.0
-        open_circuit_voltage = self.min_voltage + (self.max_voltage - self.min_voltage) * soc
+        soc = (self.usable_capacity_j - self.energy_used_j) * self.inv_usable_capacity_j
+        open_circuit_voltage = self.min_voltage + self.voltage_span * soc
         
         # Calculate desired current (I = P/V)
         desired_current = power_draw_w / open_circuit_voltage if open_circuit_voltage > 0 else 0
@@ -86,10 +102,10 @@ class Accumulator:
         self.current_discharge_a = actual_current
         
         # C-rate calculation (current relative to capacity)
-        self.c_rate = self.current_discharge_a / self.total_capacity_ah if self.total_capacity_ah > 0 else 0
+        self.c_rate = actual_current * self.inv_total_capacity_ah
         
         # Voltage sag due to internal resistance (V_sag = I * R)
-        self.voltage_sag = abs(self.current_discharge_a) * self.internal_resistance
+        self.voltage_sag = abs(actual_current) * self.internal_resistance
         
         # Pack voltage accounting for SoC and voltage sag
         if actual_current >= 0:  # Discharge
@@ -101,7 +117,7 @@ class Accumulator:
         self.pack_voltage = max(min(self.pack_voltage, self.max_voltage), self.min_voltage)
         
         # Power loss due to internal resistance (P_loss = I²R)
-        self.power_loss_w = (self.current_discharge_a ** 2) * self.internal_resistance
+        self.power_loss_w = (actual_current * actual_current) * self.internal_resistance
         
         # Thermal model: dT/dt = (P_loss - cooling) / thermal_mass
         cooling_power = self.cooling_coefficient * (self.cell_temp - self.ambient_temp)
@@ -127,7 +143,7 @@ class Kinematics:
         self.velocity += self.acceleration * timestep
         
     def braking_distance(self, target_speed, braking_force):
-        distance = (pow(target_speed,2)-pow(self.velocity,2))/(2*(-braking_force/self.mass))
+        distance = (target_speed*target_speed-self.velocity*self.velocity)/(2*(-braking_force/self.mass))
         return distance
        
 class Vehicle:
@@ -142,8 +158,11 @@ class Vehicle:
         self.FR_drivetrain = Drivetrain(vehicle_parameters["FR_drivetrain"])
         self.RL_drivetrain = Drivetrain(vehicle_parameters["RL_drivetrain"])
         self.RR_drivetrain = Drivetrain(vehicle_parameters["RR_drivetrain"])
+        self.drivetrains = (self.FL_drivetrain, self.FR_drivetrain, self.RL_drivetrain, self.RR_drivetrain)
         
         self.vehicle_tractive_force = 0
+        self.total_motor_power = 0
+        self.total_regen_power = 0
         self.longitudinal_force = 0
         self.producable_grip_force = 1
         self.drag_force = 0
@@ -153,215 +172,288 @@ class Vehicle:
     def update(self, drive):
         self.dynamic_loading.update(self.longitudinal_force)
         self.aerodynamics.update(self.kinematics.velocity)
-        self.FL_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.FL_z, drive)
-        self.FR_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.FR_z, drive)
-        self.RL_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.RL_z, drive)
-        self.RR_drivetrain.update(self.kinematics.velocity, self.dynamic_loading.RR_z, drive)
+        
+        velocity = self.kinematics.velocity
+        wheel_loads = (self.dynamic_loading.FL_z, self.dynamic_loading.FR_z,
+                       self.dynamic_loading.RL_z, self.dynamic_loading.RR_z)
+        
+        # Update each corner and total its outputs in the same pass
+        tractive_force = 0
+        producable_grip_force = 0
+        motor_power = 0
+        regen_power = 0
+        for drivetrain, fz in zip(self.drivetrains, wheel_loads):
+            corner_tractive, corner_grip, corner_motor_power, corner_regen = drivetrain.update(velocity, fz, drive)
+            tractive_force += corner_tractive
+            producable_grip_force += corner_grip
+            motor_power += corner_motor_power
+            regen_power += corner_regen
 
-        self.vehicle_tractive_force = self.FL_drivetrain.tyre.tractive_force + self.FR_drivetrain.tyre.tractive_force + self.RL_drivetrain.tyre.tractive_force + self.RR_drivetrain.tyre.tractive_force
+        self.vehicle_tractive_force = tractive_force
         self.longitudinal_force = self.vehicle_tractive_force - self.aerodynamics.drag_force
 
-        self.producable_grip_force = self.FL_drivetrain.tyre.producable_grip_force + self.FR_drivetrain.tyre.producable_grip_force + self.RL_drivetrain.tyre.producable_grip_force + self.RR_drivetrain.tyre.producable_grip_force
+        self.producable_grip_force = producable_grip_force
+        self.total_motor_power = motor_power
+        self.total_regen_power = regen_power
 
         self.kinematics.update(self.longitudinal_force)
     
     def get_total_power(self):
         """Get total instantaneous power draw from all motors"""
-        return (self.RL_drivetrain.motor.power + self.RR_drivetrain.motor.power + 
-                self.FL_drivetrain.motor.power + self.FR_drivetrain.motor.power)
+        return self.total_motor_power
 
-# Load Vehicle Configuration
-vehicle_json_file = "vehicles/"+ input('Vehicle JSON file: ')
-try:
-    with open(vehicle_json_file, "r") as read_file:
-        vehicle_parameters = json.load(read_file)
-except FileNotFoundError:
-    print(f"ERROR: Vehicle file '{vehicle_json_file}' not found!")
-    exit(1)
-except json.JSONDecodeError as e:
-    print(f"ERROR: Invalid JSON in vehicle file: {e}")
-    exit(1)
+def run_lap(vehicle, accumulator, track, timestep):
+    """Drive one lap of the track, logging every timestep.
     
-vehicle = Vehicle(vehicle_parameters)
-
-# Load Accumulator Configuration
-accumulator_json_file = "accumulators/"+ input('Accumulator JSON file: ')
-try:
-    with open(accumulator_json_file, "r") as read_file:
-        content = read_file.read()
-        if not content.strip():
-            print(f"ERROR: Accumulator file '{accumulator_json_file}' is empty!")
-            exit(1)
-        accu_params = json.loads(content)
-except FileNotFoundError:
-    print(f"ERROR: Accumulator file '{accumulator_json_file}' not found!")
-    print("Make sure you have created the 'accumulators/' folder and added your JSON file.")
-    exit(1)
-except json.JSONDecodeError as e:
-    print(f"ERROR: Invalid JSON in accumulator file: {e}")
-    print("Check that your JSON file has proper formatting (quotes, commas, braces)")
-    exit(1)
-
-accumulator = Accumulator(accu_params)
-track = Track(defined_tracks.calder_autox, vehicle)
-
-# Plotting arrays
-x = []
-velocity = []
-available_power = []
-actual_power = []
+    Returns the lap time, energy consumed and regenerated (J) and the log trimmed
+    to the steps taken, one row per channel."""
+    # Hot methods bound once, locals are cheaper to look up than globals
+    vehicle_update = vehicle.update
+    accumulator_update = accumulator.update
+    track_drive = track.drive
+    is_driving = track.is_driving
+    
+    # Preallocated log, each timestep is written as one column
+    max_steps = int(expected_lap_time / timestep) + 1000
+    log = np.empty((NUM_LOG_ROWS, max_steps))
+    i = 0
+    
+    sim_time = 0
+    energy_consumed = 0
+    energy_regenerated = 0
+    
+    while is_driving():
+        vehicle_update(track_drive(vehicle, timestep))
 
-# Accumulator tracking arrays
-soc_percent = []
-discharge_current = []
-energy_remaining_kwh = []
-pack_voltage = []
-voltage_sag = []
-regen_power_track = []
-total_power_draw = []
-power_loss = []
+        sim_time += timestep
+        
+        # Power and energy calculations
+        total_power = vehicle.get_total_power()
+        energy_consumed += total_power * timestep  # joules
+        
+        regen_power = vehicle.total_regen_power
+        energy_regenerated += regen_power * timestep  # joules
+        
+        # Update accumulator
+        net_power = total_power - regen_power
+        accumulator_update(net_power, timestep)
+        
+        # Data logging (grow the buffer if the lap outlasts the estimate), powers in kW
+        if i == max_steps:
+            log = np.concatenate((log, np.empty_like(log)), axis=1)
+            max_steps *= 2
+        log[:, i] = (sim_time,
+                     vehicle.kinematics.velocity,
+                     total_power / 1000,
+                     accumulator.get_soc_percent(),
+                     accumulator.current_discharge_a,
+                     accumulator.get_energy_remaining_kwh(),
+                     accumulator.pack_voltage,
+                     accumulator.voltage_sag,
+                     regen_power / 1000,
+                     accumulator.power_loss_w / 1000)
+        i += 1
+    
+    # Copy out the steps taken so the spare buffer capacity can be freed
+    return sim_time, energy_consumed, energy_regenerated, log[:, :i].copy()
 
-energy_consumed = 0
-energy_regenerated = 0
+def load_vehicle_parameters(vehicle_json_file):
+    """Read a vehicle configuration, exiting with a message if it cannot be loaded"""
+    try:
+        with open(vehicle_json_file, "r") as read_file:
+            return json.load(read_file)
+    except FileNotFoundError:
+        print(f"ERROR: Vehicle file '{vehicle_json_file}' not found!")
+        exit(1)
+    except json.JSONDecodeError as e:
+        print(f"ERROR: Invalid JSON in vehicle file: {e}")
+        exit(1)
 
-# Sim Loop
-print(f"\n=== Starting Lap Simulation ===")
-print(f"Vehicle: {vehicle_parameters['name']}")
-print(f"Accumulator: {accumulator.total_capacity_wh}Wh @ {accumulator.nominal_voltage}V")
-print(f"Configuration: {accumulator.num_series}S{accumulator.num_parallel}P ({accumulator.total_cells} cells)")
-print(f"Internal Resistance: {accumulator.internal_resistance}Ω")
-print(f"Max Current: {accumulator.max_current}A, Max Power: {accumulator.max_power/1000}kW")
-print(f"Energy consumption multiplier: 1.5x (conservative estimate)\n")
+def load_accumulator_parameters(accumulator_json_file):
+    """Read an accumulator configuration, exiting with a message if it cannot be loaded"""
+    try:
+        with open(accumulator_json_file, "r") as read_file:
+            content = read_file.read()
+            if not content.strip():
+                print(f"ERROR: Accumulator file '{accumulator_json_file}' is empty!")
+                exit(1)
+            return json.loads(content)
+    except FileNotFoundError:
+        print(f"ERROR: Accumulator file '{accumulator_json_file}' not found!")
+        print("Make sure you have created the 'accumulators/' folder and added your JSON file.")
+        exit(1)
+    except json.JSONDecodeError as e:
+        print(f"ERROR: Invalid JSON in accumulator file: {e}")
+        print("Check that your JSON file has proper formatting (quotes, commas, braces)")
+        exit(1)
 
-while(track.is_driving()):
-    vehicle.update(track.drive(vehicle, timestep))
+@dataclass
+class SimResult:
+    """Outcome of one simulated lap, the logged channels are one array per channel"""
+    vehicle_name: str
+    accumulator: Accumulator  # final pack state
+    lap_time: float
+    energy_consumed: float  # joules
+    energy_regenerated: float  # joules
+    max_available_power_kw: float
+    x: np.ndarray
+    velocity: np.ndarray
+    actual_power: np.ndarray
+    soc_percent: np.ndarray
+    discharge_current: np.ndarray
+    energy_remaining_kwh: np.ndarray
+    pack_voltage: np.ndarray
+    voltage_sag: np.ndarray
+    regen_power_track: np.ndarray
+    total_power_draw: np.ndarray
+    power_loss: np.ndarray
 
-    sim_time += timestep
-    
-    # Power and energy calculations
-    total_power = vehicle.get_total_power()
-    energy_consumed += total_power * timestep  # joules
+def run_simulation(vehicle_params, accu_params, verbose=False):
+    """Simulate one lap of the Calder autocross with the given configurations.
     
-    regen_power = (vehicle.RL_drivetrain.regen_power + vehicle.RR_drivetrain.regen_power + 
-                   vehicle.FL_drivetrain.regen_power + vehicle.FR_drivetrain.regen_power)
-    energy_regenerated += regen_power * timestep  # joules
+    Only parameter dicts are taken, so sweeps can call this repeatedly without
+    re-reading JSON or re-importing the module."""
+    vehicle = Vehicle(vehicle_params)
+    accumulator = Accumulator(accu_params)
+    track = Track(defined_tracks.calder_autox, vehicle)
+    # The track segments are shared between runs, clear any previous lap's progress
+    track.reset()
     
-    # Update accumulator
-    net_power = total_power - regen_power
-    accumulator.update(net_power, timestep)
+    # Combined motor power limit, constant for the lap so it is not logged per step
+    max_available_power_kw = sum(float(vehicle_params[drivetrain]["power_limit"])
+                                 for drivetrain in ("FL_drivetrain", "FR_drivetrain",
+                                                    "RL_drivetrain", "RR_drivetrain")) / 1000
     
-    # Data logging
-    x.append(sim_time)
-    velocity.append(vehicle.kinematics.velocity)
+    if verbose:
+        print(f"\n=== Starting Lap Simulation ===")
+        print(f"Vehicle: {vehicle_params['name']}")
+        print(f"Accumulator: {accumulator.total_capacity_wh}Wh @ {accumulator.nominal_voltage}V")
+        print(f"Configuration: {accumulator.num_series}S{accumulator.num_parallel}P ({accumulator.total_cells} cells)")
+        print(f"Internal Resistance: {accumulator.internal_resistance}Ω")
+        print(f"Max Current: {accumulator.max_current}A, Max Power: {accumulator.max_power/1000}kW")
+        print(f"Energy consumption multiplier: 1.5x (conservative estimate)\n")
     
-    # Power data
-    max_available_power = (float(vehicle_parameters["FL_drivetrain"]["power_limit"]) + 
-                          float(vehicle_parameters["FR_drivetrain"]["power_limit"]) + 
-                          float(vehicle_parameters["RL_drivetrain"]["power_limit"]) + 
-                          float(vehicle_parameters["RR_drivetrain"]["power_limit"]))
-    available_power.append(max_available_power / 1000)
-    actual_power.append(total_power / 1000)
+    sim_time, energy_consumed, energy_regenerated, log = run_lap(vehicle, accumulator, track, timestep)
+    actual_power = log[ACTUAL_POWER_ROW]
     
-    # Accumulator data
-    soc_percent.append(accumulator.get_soc_percent())
-    discharge_current.append(accumulator.current_discharge_a)
-    energy_remaining_kwh.append(accumulator.get_energy_remaining_kwh())
-    pack_voltage.append(accumulator.pack_voltage)
-    voltage_sag.append(accumulator.voltage_sag)
-    regen_power_track.append(regen_power / 1000)  # Convert to kW
-    total_power_draw.append(total_power / 1000)
-    power_loss.append(accumulator.power_loss_w / 1000)  # Convert to kW
+    # One array per channel, picked out of the log by row
+    return SimResult(vehicle_name=vehicle_params["name"],
+                     accumulator=accumulator,
+                     lap_time=sim_time,
+                     energy_consumed=energy_consumed,
+                     energy_regenerated=energy_regenerated,
+                     max_available_power_kw=max_available_power_kw,
+                     x=log[X_ROW],
+                     velocity=log[VELOCITY_ROW],
+                     actual_power=actual_power,
+                     soc_percent=log[SOC_ROW],
+                     discharge_current=log[CURRENT_ROW],
+                     energy_remaining_kwh=log[ENERGY_REMAINING_ROW],
+                     pack_voltage=log[PACK_VOLTAGE_ROW],
+                     voltage_sag=log[VOLTAGE_SAG_ROW],
+                     regen_power_track=log[REGEN_POWER_ROW],
+                     total_power_draw=actual_power,
+                     power_loss=log[POWER_LOSS_ROW])
+
+def print_results(result):
+    """Print the lap summary"""
+    accumulator = result.accumulator
+    print("\n=== Lap Complete ===")
+    print(f"Lap Time: {result.lap_time:.2f}s")
+    print(f"\nEnergy Consumed: {result.energy_consumed/1000000:.2f}MJ ({result.energy_consumed/3600000:.2f}kWh)")
+    print(f"Energy Regenerated: {result.energy_regenerated/1000000:.2f}MJ ({result.energy_regenerated/3600000:.2f}kWh)")
+    print(f"Net Energy Used: {(result.energy_consumed-result.energy_regenerated)/3600000:.2f}kWh")
+    print(f"\nFinal State of Charge: {accumulator.get_soc_percent():.1f}%")
+    print(f"Energy Remaining: {accumulator.get_energy_remaining_kwh():.2f}kWh")
+    print(f"Peak Discharge Current: {result.discharge_current.max():.1f}A")
+    print(f"Max Voltage Sag: {result.voltage_sag.max():.1f}V")
+    print(f"Min Pack Voltage: {result.pack_voltage.min():.1f}V")
+    print(f"Peak Regen Power: {result.regen_power_track.max():.2f}kW")
 
-# Results
-print("\n=== Lap Complete ===")
-print(f"Lap Time: {sim_time:.2f}s")
-print(f"\nEnergy Consumed: {energy_consumed/1000000:.2f}MJ ({energy_consumed/3600000:.2f}kWh)")
-print(f"Energy Regenerated: {energy_regenerated/1000000:.2f}MJ ({energy_regenerated/3600000:.2f}kWh)")
-print(f"Net Energy Used: {(energy_consumed-energy_regenerated)/3600000:.2f}kWh")
-print(f"\nFinal State of Charge: {accumulator.get_soc_percent():.1f}%")
-print(f"Energy Remaining: {accumulator.get_energy_remaining_kwh():.2f}kWh")
-print(f"Peak Discharge Current: {max(discharge_current):.1f}A")
-print(f"Max Voltage Sag: {max(voltage_sag):.1f}V")
-print(f"Min Pack Voltage: {min(pack_voltage):.1f}V")
-print(f"Peak Regen Power: {max(regen_power_track):.2f}kW")
+def plot_results(result):
+    """Plot the logged lap channels"""
+    fig1, axes = plt.subplots(4, 2, figsize=(16, 12), constrained_layout=True)
 
-# Plotting
-fig1 = plt.figure(figsize=(16, 12))
+    # Velocity
+    axes[0, 0].set_title(f'{result.vehicle_name} - Velocity Profile')
+    axes[0, 0].set_xlabel("Time (s)")
+    axes[0, 0].set_ylabel("Velocity (m/s)")
+    axes[0, 0].plot(result.x, result.velocity, '-b', linewidth=0.8, rasterized=True)
+    axes[0, 0].grid(True, alpha=0.3)
 
-# Velocity
-plt.subplot(4, 2, 1)
-plt.title(f'{vehicle_parameters["name"]} - Velocity Profile')
-plt.xlabel("Time (s)")
-plt.ylabel("Velocity (m/s)")
-plt.plot(x, velocity, '-b', linewidth=0.8)
-plt.grid(True, alpha=0.3)
+    # State of Charge
+    axes[0, 1].set_title('Accumulator State of Charge')
+    axes[0, 1].set_xlabel("Time (s)")
+    axes[0, 1].set_ylabel("SoC (%)")
+    axes[0, 1].plot(result.x, result.soc_percent, '-r', linewidth=1.2, rasterized=True)
+    axes[0, 1].axhline(y=0, color='k', linestyle='--', alpha=0.5, label='Empty')
+    axes[0, 1].axhline(y=100, color='g', linestyle='--', alpha=0.5, label='Full')
+    axes[0, 1].grid(True, alpha=0.3)
+    axes[0, 1].legend()
 
-# State of Charge
-plt.subplot(4, 2, 2)
-plt.title('Accumulator State of Charge')
-plt.xlabel("Time (s)")
-plt.ylabel("SoC (%)")
-plt.plot(x, soc_percent, '-r', linewidth=1.2)
-plt.axhline(y=0, color='k', linestyle='--', alpha=0.5, label='Empty')
-plt.axhline(y=100, color='g', linestyle='--', alpha=0.5, label='Full')
-plt.grid(True, alpha=0.3)
-plt.legend()
+    # Pack Voltage
+    axes[1, 0].set_title('Pack Voltage')
+    axes[1, 0].set_xlabel("Time (s)")
+    axes[1, 0].set_ylabel("Voltage (V)")
+    axes[1, 0].plot(result.x, result.pack_voltage, color='blue', linewidth=1.0, rasterized=True)
+    axes[1, 0].axhline(y=result.accumulator.min_voltage_ams_fault, color='r', linestyle='--', alpha=0.5, label='AMS Fault')
+    axes[1, 0].axhline(y=result.accumulator.nominal_voltage, color='g', linestyle='--', alpha=0.5, label='Nominal')
+    axes[1, 0].grid(True, alpha=0.3)
+    axes[1, 0].legend()
 
-# Pack Voltage
-plt.subplot(4, 2, 3)
-plt.title('Pack Voltage')
-plt.xlabel("Time (s)")
-plt.ylabel("Voltage (V)")
-plt.plot(x, pack_voltage, color='blue', linewidth=1.0)
-plt.axhline(y=accumulator.min_voltage_ams_fault, color='r', linestyle='--', alpha=0.5, label='AMS Fault')
-plt.axhline(y=accumulator.nominal_voltage, color='g', linestyle='--', alpha=0.5, label='Nominal')
-plt.grid(True, alpha=0.3)
-plt.legend()
+    # Voltage Sag
+    axes[1, 1].set_title('Voltage Sag (I×R)')
+    axes[1, 1].set_xlabel("Time (s)")
+    axes[1, 1].set_ylabel("Voltage Drop (V)")
+    axes[1, 1].plot(result.x, result.voltage_sag, color='orange', linewidth=0.8, rasterized=True)
+    axes[1, 1].grid(True, alpha=0.3)
 
-# Voltage Sag
-plt.subplot(4, 2, 4)
-plt.title('Voltage Sag (I×R)')
-plt.xlabel("Time (s)")
-plt.ylabel("Voltage Drop (V)")
-plt.plot(x, voltage_sag, color='orange', linewidth=0.8)
-plt.grid(True, alpha=0.3)
+    # Discharge Current
+    axes[2, 0].set_title('Discharge Current')
+    axes[2, 0].set_xlabel("Time (s)")
+    axes[2, 0].set_ylabel("Current (A)")
+    axes[2, 0].plot(result.x, result.discharge_current, color='purple', linewidth=0.8, rasterized=True)
+    axes[2, 0].axhline(y=result.accumulator.max_current, color='r', linestyle='--', alpha=0.5, label='Max Current')
+    axes[2, 0].grid(True, alpha=0.3)
+    axes[2, 0].legend()
 
-# Discharge Current
-plt.subplot(4, 2, 5)
-plt.title('Discharge Current')
-plt.xlabel("Time (s)")
-plt.ylabel("Current (A)")
-plt.plot(x, discharge_current, color='purple', linewidth=0.8)
-plt.axhline(y=accumulator.max_current, color='r', linestyle='--', alpha=0.5, label='Max Current')
-plt.grid(True, alpha=0.3)
-plt.legend()
+    # Energy Remaining
+    axes[2, 1].set_title('Energy Remaining')
+    axes[2, 1].set_xlabel("Time (s)")
+    axes[2, 1].set_ylabel("Energy (kWh)")
+    axes[2, 1].plot(result.x, result.energy_remaining_kwh, color='magenta', linewidth=1.2, rasterized=True)
+    axes[2, 1].grid(True, alpha=0.3)
 
-# Energy Remaining
-plt.subplot(4, 2, 6)
-plt.title('Energy Remaining')
-plt.xlabel("Time (s)")
-plt.ylabel("Energy (kWh)")
-plt.plot(x, energy_remaining_kwh, color='magenta', linewidth=1.2)
-plt.grid(True, alpha=0.3)
+    # Regenerative Braking Power
+    axes[3, 0].set_title('Regenerative Braking Power')
+    axes[3, 0].set_xlabel("Time (s)")
+    axes[3, 0].set_ylabel("Regen Power (kW)")
+    axes[3, 0].plot(result.x, result.regen_power_track, color='green', linewidth=0.8, rasterized=True)
+    axes[3, 0].fill_between(result.x, 0, result.regen_power_track, color='green', alpha=0.3, rasterized=True)
+    axes[3, 0].grid(True, alpha=0.3)
 
-# Regenerative Braking Power
-plt.subplot(4, 2, 7)
-plt.title('Regenerative Braking Power')
-plt.xlabel("Time (s)")
-plt.ylabel("Regen Power (kW)")
-plt.plot(x, regen_power_track, color='green', linewidth=0.8)
-plt.fill_between(x, 0, regen_power_track, color='green', alpha=0.3)
-plt.grid(True, alpha=0.3)
+    # Power: Available vs Actual
+    axes[3, 1].set_title('Power: Available vs Actual Usage')
+    axes[3, 1].set_xlabel("Time (s)")
+    axes[3, 1].set_ylabel("Power (kW)")
+    axes[3, 1].axhline(y=result.max_available_power_kw, color='gray', linestyle='--', linewidth=1.0, alpha=0.7, label='Available')
+    axes[3, 1].plot(result.x, result.actual_power, '-', color='blue', linewidth=0.8, label='Actual Used', rasterized=True)
+    axes[3, 1].grid(True, alpha=0.3)
+    axes[3, 1].legend()
 
-# Power: Available vs Actual
-plt.subplot(4, 2, 8)
-plt.title('Power: Available vs Actual Usage')
-plt.xlabel("Time (s)")
-plt.ylabel("Power (kW)")
-plt.plot(x, available_power, '--', color='gray', linewidth=1.0, label='Available', alpha=0.7)
-plt.plot(x, actual_power, '-', color='blue', linewidth=0.8, label='Actual Used')
-plt.grid(True, alpha=0.3)
-plt.legend()
+    plt.show()
 
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate one autocross lap and plot the results")
+    parser.add_argument("vehicle", nargs="?", default="UCM26.json",
+                        help="vehicle JSON file in vehicles/ (default: %(default)s)")
+    parser.add_argument("accumulator", nargs="?", default="EP85_136s2p.json",
+                        help="accumulator JSON file in accumulators/ (default: %(default)s)")
+    args = parser.parse_args()
+    
+    vehicle_parameters = load_vehicle_parameters("vehicles/" + args.vehicle)
+    accu_params = load_accumulator_parameters("accumulators/" + args.accumulator)
+    
+    result = run_simulation(vehicle_parameters, accu_params, verbose=True)
+    print_results(result)
+    plot_results(result)
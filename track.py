@@ -61,18 +61,20 @@ class TrackSegment:
         return True
     
     def drive(self, vehicle):
-        # Determine if reached braking point
-        if self.distance_remaining <= vehicle.kinematics.braking_distance(self.exit_velocity,vehicle.producable_grip_force):
+        velocity = vehicle.kinematics.velocity
+        
+        # Determine if reached braking point (once braking the segment stays braking, so skip the check)
+        if not self.braking and self.distance_remaining <= vehicle.kinematics.braking_distance(self.exit_velocity,vehicle.producable_grip_force):
             self.braking = True
             
         if self.braking:
-            if vehicle.kinematics.velocity > self.exit_velocity:
+            if velocity > self.exit_velocity:
                 return -1 #Continue braking
             else:
                 #Reached target velocity
-                return self.velocity_hold_PID(self.exit_velocity, vehicle.kinematics.velocity)
+                return self.velocity_hold_PID(self.exit_velocity, velocity)
             
-        return self.velocity_hold_PID(self.velocity_limit, vehicle.kinematics.velocity)
+        return self.velocity_hold_PID(self.velocity_limit, velocity)
 
     def velocity_hold_PID(self, target_velocity, current_velocity):
         error = target_velocity - current_velocity